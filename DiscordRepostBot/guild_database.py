@@ -6,6 +6,8 @@ guild.
 Author: Scott Nealon
 """
 
+import asyncio
+import functools
 import logging
 import os
 import sqlite3
@@ -19,126 +21,232 @@ import emoji as emoji_library
 
 logger = logging.getLogger(__name__)
 
+# Resolved once at import rather than per GuildDatabase construction
+DATABASES_DIR = Path(os.path.dirname(os.path.realpath(__file__))).joinpath("databases")
+
+# Tables and columns the generic query helpers are allowed to interpolate into SQL. Values are
+# always bound as named parameters; only identifiers from this whitelist ever reach the query text.
+TABLE_COLUMNS = {
+    "members": frozenset(("memberID",)),
+    "blacklistedMembers": frozenset(("memberID",)),
+    "blacklistedChannels": frozenset(("channelID",)),
+    "originals": frozenset(("url", "messageID", "channelID", "memberID", "timestamp")),
+    "reposts": frozenset(("url", "messageID", "channelID", "memberID", "timestamp")),
+}
+
+
+# Full schema for a new guild database, compiled once and executed as a single script
+NEW_DATABASE_SCRIPT = """
+CREATE TABLE preferences(key VARCHAR NOT NULL PRIMARY KEY, value);
+INSERT INTO preferences (key, value) VALUES ("active", 1);
+INSERT INTO preferences (key, value) VALUES ("emoji", "recycle");
+CREATE TABLE members(memberID INT NOT NULL PRIMARY KEY);
+CREATE TABLE blacklistedMembers(
+    memberID INT NOT NULL PRIMARY KEY,
+    FOREIGN KEY (memberID) REFERENCES members(memberID)
+);
+CREATE TABLE blacklistedChannels(channelID INT NOT NULL PRIMARY KEY);
+CREATE TABLE originals(
+    url VARCHAR NOT NULL PRIMARY KEY,
+    messageID INT NOT NULL,
+    channelID INT NOT NULL,
+    memberID INT NOT NULL,
+    timestamp FLOAT NOT NULL,
+    FOREIGN KEY (memberID) REFERENCES members(memberID)
+);
+CREATE TABLE reposts(
+    url VARCHAR NOT NULL,
+    messageID INT NOT NULL,
+    channelID INT NOT NULL,
+    memberID INT NOT NULL,
+    timestamp FLOAT NOT NULL,
+    FOREIGN KEY (url) REFERENCES originals(url),
+    FOREIGN KEY (memberID) REFERENCES members(memberID)
+);
+CREATE UNIQUE INDEX repost_index ON reposts (url, messageID, channelID);
+"""
+
+
 class ReadableRow(sqlite3.Row):
 
     def __repr__(self):
-        return f"sqlite3.Row({ {key: value for key, value in zip(self.keys(), self)} })"
+        # Stream straight into the string rather than materializing an intermediate dict
+        return f"sqlite3.Row({{{', '.join(f'{key!r}: {value!r}' for key, value in zip(self.keys(), self))}}})"
 
 
 class GuildDatabase:
 
-    newest_version = 15
+    newest_version = 17
 
     def __init__(self, guild: discord.Guild, bot: discord.ext.commands.Bot):
         self.guild = guild
         self.bot = bot
-        self.path = (
-            Path(os.path.dirname(os.path.realpath(__file__))).joinpath("databases").joinpath(f"{guild.id}.sqlite3")
-        )
+        self.path = DATABASES_DIR.joinpath(f"{guild.id}.sqlite3")
         self._create_connection()
 
     def _create_connection(self):
         """Creates a connection to guild SQLite3 database, populating as necessary"""
         is_new_database = not self.path.exists()
         if is_new_database:
-            logger.info(f'Creating new database for guild "{self.guild}".')
-        self.connection = sqlite3.connect(self.path)
+            logger.info('Creating new database for guild "%s".', self.guild)
+        # Larger statement cache keeps the per-message queries compiled across calls;
+        # check_same_thread=False lets blocking calls run in asyncio.to_thread workers
+        self.connection = sqlite3.connect(self.path, cached_statements=512, check_same_thread=False)
         self.connection.row_factory = ReadableRow
+        self._configure_connection()
         if not self._is_valid_database(new=is_new_database):
             self._create_database(is_new_database)
+        self._create_indices()
+        self.connection.commit()
+        # Companion read-only connection so SELECTs run concurrently with the writer under WAL
+        self.read_connection = sqlite3.connect(
+            f"file:{self.path}?mode=ro", uri=True, cached_statements=512, check_same_thread=False
+        )
+        self.read_connection.row_factory = ReadableRow
+        self.read_connection.execute("PRAGMA query_only = 1;")
+
+    def _configure_connection(self):
+        """Tunes SQLite for the write-heavy message review workload"""
+        # WAL avoids an fsync per commit and allows readers to run concurrently with the writer
+        self.connection.execute("PRAGMA journal_mode = WAL;")
+        self.connection.executescript(
+            """
+            PRAGMA synchronous = NORMAL;
+            PRAGMA temp_store = MEMORY;
+            PRAGMA mmap_size = 268435456;
+            PRAGMA cache_size = -65536;
+            PRAGMA wal_autocheckpoint = 0;
+            """
+        )
 
     def _is_valid_database(self, new: bool) -> bool:
-        """Returns TRUE if able to match version in table, otherwise returns FALSE"""
-        try:
-            correct_version = self.version == self.newest_version
-        except sqlite3.OperationalError as error:
-            correct_version = False
-        except TypeError as error:
-            correct_version = False
+        """Returns TRUE if able to match version pragma, otherwise returns FALSE"""
+        # user_version defaults to 0, so fresh and pre-pragma databases both read as invalid
+        correct_version = self.version == self.newest_version
         if not correct_version and not new:
-            logger.warning(f"Invalid database for {self.guild} ({self.path.name}). Creating new database.")
+            logger.warning("Invalid database for %s (%s). Creating new database.", self.guild, self.path.name)
         return correct_version
 
     def _create_database(self, new: bool):
         """Creates a new guild SQLite3 database"""
         if not new:
-            # Delete and recreate database
+            # Delete and recreate database, reconnecting with the same options as
+            # _create_connection so threaded commits keep working after a rebuild
             self.connection.close()
             os.remove(self.path)
-            self.connection = sqlite3.connect(self.path)
-        # Run commands
-        self._create_version_table()
-        self._create_updated_table()
-        self._create_active_table()
-        self._create_emoji_table()
-        self._create_member_table()
-        self._create_blacklisted_member_table()
-        self._create_blacklisted_channels_table()
-        self._create_originals_table()
-        self._create_reposts_table()
+            self.connection = sqlite3.connect(self.path, cached_statements=512, check_same_thread=False)
+            self.connection.row_factory = ReadableRow
+            self._configure_connection()
+        # Run full schema script, then the inserts that need bound values
+        self.connection.executescript(NEW_DATABASE_SCRIPT)
+        # PRAGMA cannot bind parameters, so interpolate the int directly
+        self.connection.execute(f"PRAGMA user_version = {int(self.newest_version)};")
+        self.connection.execute(
+            "INSERT INTO preferences (key, value) VALUES ('oldestUpdate', :now), ('lastUpdate', :now);",
+            {"now": time.time()},
+        )
         self.connection.commit()
 
+    def _create_indices(self):
+        """Creates any missing indices, upgrading existing databases without a full rebuild"""
+        self.connection.executescript(
+            """
+            CREATE INDEX IF NOT EXISTS original_member_index ON originals (memberID);
+            CREATE INDEX IF NOT EXISTS repost_member_index ON reposts (memberID);
+            CREATE INDEX IF NOT EXISTS original_channel_timestamp_index ON originals (channelID, timestamp);
+            """
+        )
+
     ### ABSTRACT QUERIES ###
 
+    _dirty = False
+
+    @property
+    def _reader(self) -> sqlite3.Connection:
+        """Routes reads to the read-only connection unless uncommitted writes would be missed"""
+        return self.connection if self._dirty else self.read_connection
+
     @staticmethod
-    def _conditional_from_arguments(**kwargs):
-        if any(value is not None for value in kwargs.values()):
-            return f"WHERE {', '.join([f'{key} = :{key}' for key, value in kwargs.items() if value is not None])}"
+    def _validate_identifiers(table: str, kwargs):
+        """Raises ValueError if table or column names are not whitelisted in TABLE_COLUMNS"""
+        try:
+            columns = TABLE_COLUMNS[table]
+        except KeyError:
+            raise ValueError(f"Unrecognized table: {table}")
+        invalid_columns = set(kwargs) - columns
+        if invalid_columns:
+            raise ValueError(f"Unrecognized columns for table {table}: {sorted(invalid_columns)}")
+
+    @staticmethod
+    @functools.lru_cache(maxsize=256)
+    def _conditional_from_keys(keys: tuple[str]) -> str:
+        if keys:
+            return f"WHERE {' AND '.join([f'{key} = :{key}' for key in keys])}"
         else:
             return ""
 
-    def _query_table(self, table: str, **kwargs):
-        query = f"SELECT * FROM {table} {self._conditional_from_arguments(**kwargs)}"
-        return self.connection.execute(query, kwargs).fetchall()
+    @staticmethod
+    @functools.lru_cache(maxsize=256)
+    def _query_sql(table: str, keys: tuple[str]) -> str:
+        return f"SELECT * FROM {table} {GuildDatabase._conditional_from_keys(keys)}"
 
-    def _add_to_table(self, table: str, **kwargs):
-        query = f"INSERT INTO {table} ({', '.join([key for key in kwargs])}) VALUES ({', '.join([f':{key}' for key in kwargs])})"
-        return self.connection.execute(query, kwargs).fetchall()
+    @staticmethod
+    @functools.lru_cache(maxsize=256)
+    def _remove_sql(table: str, keys: tuple[str]) -> str:
+        return f"DELETE FROM {table} {GuildDatabase._conditional_from_keys(keys)}"
 
-    def _update_table(self, table: str, **kwargs):
-        query = f"UPDATE {table} SET {', '.join([f'{key} = :{key}' for key in kwargs])} {self._conditional_from_arguments(**kwargs)}"
-        return self.connection.execute(query, kwargs).fetchall()
+    @staticmethod
+    def _conditional_keys(kwargs) -> tuple[str]:
+        return tuple(key for key, value in kwargs.items() if value is not None)
+
+    def _query_table(self, table: str, **kwargs):
+        self._validate_identifiers(table, kwargs)
+        query = self._query_sql(table, self._conditional_keys(kwargs))
+        return self._reader.execute(query, kwargs).fetchall()
 
     def _remove_from_table(self, table: str, **kwargs):
-        query = f"DELETE FROM {table} {self._conditional_from_arguments(**kwargs)}"
+        self._validate_identifiers(table, kwargs)
+        query = self._remove_sql(table, self._conditional_keys(kwargs))
+        self._dirty = True
         return self.connection.execute(query, kwargs).fetchall()
 
     ### PROPERTIES ###
 
     # VERSION #
 
-    _verion_args = ""
+    @property
+    def version(self) -> int:
+        return self.connection.execute("PRAGMA user_version;").fetchone()[0]
 
-    def _create_version_table(self):
-        self.connection.execute("CREATE TABLE version(version INT NOT NULL);")
-        self.connection.execute(
-            "INSERT INTO version (version) VALUES (:version);",
-            {"version": self.newest_version},
-        )
+    # PREFERENCES #
+
+    _preferences = None
 
     @property
-    def version(self) -> int:
-        return self.connection.execute("SELECT * FROM version;").fetchone()[0]
+    def preferences(self) -> dict:
+        """dict : All guild preferences, loaded once and kept in sync by the setters"""
+        if self._preferences is None:
+            self._preferences = dict(self.connection.execute("SELECT key, value FROM preferences"))
+        return self._preferences
 
-    # UPDATED #
+    def _set_preference(self, key: str, value):
+        self.connection.execute("UPDATE preferences SET value = :value WHERE key = :key", {"key": key, "value": value})
+        self._dirty = True
+        self.preferences[key] = value
 
-    def _create_updated_table(self):
-        self.connection.execute("CREATE TABLE updates(oldestUpdate FLOAT NOT NULL, lastUpdate FLOAT NOT NULL);")
-        self.connection.execute(
-            "INSERT INTO updates (oldestUpdate, lastUpdate) VALUES (:now, :now);", {"now": time.time()}
-        )
+    # UPDATED #
 
     @property
     def oldest_update(self) -> float:
-        return self.connection.execute("SELECT oldestUpdate FROM updates;").fetchone()[0]
+        return self.preferences["oldestUpdate"]
 
     @oldest_update.setter
     def oldest_update(self, oldest_update: float):
-        self.connection.execute("UPDATE updates SET oldestUpdate = :oldestUpdate;", {"oldestUpdate": oldest_update})
+        self._set_preference("oldestUpdate", oldest_update)
 
     @property
     def last_updated(self) -> float:
-        return self.connection.execute("SELECT lastUpdate FROM updates;").fetchone()[0]
+        return self.preferences["lastUpdate"]
 
     @property
     def last_updated_datetime(self) -> datetime:
@@ -146,142 +254,141 @@ class GuildDatabase:
 
     @last_updated.setter
     def last_updated(self, last_updated: float):
-        self.connection.execute("UPDATE updates SET lastUpdate = :lastUpdate", {"lastUpdate": last_updated})
+        self._set_preference("lastUpdate", last_updated)
 
     # SERVER ACTIVE STATUS
 
-    def _create_active_table(self):
-        self.connection.executescript(
-            """
-            CREATE TABLE active(active INT NOT NULL);
-            INSERT INTO active (active) VALUES (1)
-            """
-        )
-
     @property
     def active(self) -> bool:
-        return self.connection.execute("SELECT * FROM active;").fetchone()[0]
+        return self.preferences["active"]
 
     @active.setter
-    def set_active(self, active: bool):
-        self.connection.execute("UPDATE active SET active = :active", {"active": active})
+    def active(self, active: bool):
+        self._set_preference("active", active)
 
     # EMOJI #
 
     _emoji = None
 
-    def _create_emoji_table(self):
-        self.connection.executescript(
-            """
-            CREATE TABLE emoji(emoji VARCHAR NOT NULL);
-            INSERT INTO emoji (emoji) VALUES ("recycle")
-            """
-        )
-
     @property
     def emoji_str(self) -> str:
-        return self.connection.execute("SELECT * FROM emoji;").fetchone()[0]
+        return self.preferences["emoji"]
 
     @emoji_str.setter
-    def set_emoji_str(self, emoji_str: str):
-        self.connection.execute("UPDATE emoji SET emoji = :emoji", {"emoji": emoji_str})
+    def emoji_str(self, emoji_str: str):
+        self._set_preference("emoji", emoji_str)
+
+    _emoji_key = None
 
     @property
     def emoji(self) -> discord.Emoji:
         """Save self._emoji to not need to search on every query."""
         # Get emoji string from database
         emoji_str = self.emoji_str
-        # Compare name of emoji to saved emoji
-        if not (type(self._emoji) == discord.Emoji and self._emoji.name == emoji_str) or (
-            type(self._emoji) == str
-            and self._emoji == emoji_library.EMOJI_ALIAS_UNICODE_ENGLISH.get(f":{emoji_str}:", None)
-        ):
-            # If nothing matches, try to find matching discord or unicode emoji
-            for emoji in self.bot.emojis:
-                if emoji.name == emoji_str:
-                    self._emoji = emoji
-            else:
-                try:
-                    self._emoji = emoji_library.EMOJI_ALIAS_UNICODE_ENGLISH[f":{emoji_str}:"]
-                except:
-                    raise ValueError(f"{emoji_str} not found in bot's emojis or unicode.")
+        # Only search when the configured emoji string has changed
+        if self._emoji is None or self._emoji_key != emoji_str:
+            self._emoji = self._find_emoji(emoji_str)
+            self._emoji_key = emoji_str
         return self._emoji
 
-    # MEMBERS #
+    def _find_emoji(self, emoji_str: str):
+        """Returns the matching discord or unicode emoji for an emoji name"""
+        for emoji in self.bot.emojis:
+            if emoji.name == emoji_str:
+                return emoji
+        unicode_emoji = emoji_library.emojize(f":{emoji_str}:", language="alias")
+        if unicode_emoji != f":{emoji_str}:":
+            return unicode_emoji
+        raise ValueError(f"{emoji_str} not found in bot's emojis or unicode.")
 
-    def _create_member_table(self):
-        self.connection.execute("CREATE TABLE members(memberID INT NOT NULL PRIMARY KEY);")
+    # MEMBERS #
 
-    def get_members(self) -> tuple[tuple[int]]:
-        return self.connection.execute("SELECT * FROM members").fetchall()
+    def get_members(self) -> tuple[int]:
+        # Raw cursor skips one ReadableRow allocation per member
+        cursor = self._reader.cursor()
+        cursor.row_factory = None
+        return tuple(row[0] for row in cursor.execute("SELECT memberID FROM members"))
 
     def is_member(self, member_id: int) -> bool:
-        matching_members = self.connection.execute(
-            "SELECT * FROM members WHERE memberID = :memberID", {"memberID": member_id}
-        ).fetchone()
-        return len(matching_members) > 0
+        return bool(
+            self._reader.execute(
+                "SELECT EXISTS(SELECT 1 FROM members WHERE memberID = :memberID)", {"memberID": member_id}
+            ).fetchone()[0]
+        )
 
     def add_member(self, member: discord.Member):
+        self._dirty = True
         self.connection.execute("INSERT INTO members (memberID) VALUES (:memberID);", {"memberID": member.id})
 
+    def add_members(self, members: list[discord.Member]):
+        """Inserts many members in one executemany batch"""
+        if not members:
+            return
+        self._dirty = True
+        self.connection.executemany(
+            "INSERT OR IGNORE INTO members (memberID) VALUES (:memberID);",
+            [{"memberID": member.id} for member in members],
+        )
+
     def remove_member(self, member: discord.Member):
+        self._dirty = True
         self.connection.execute("DELETE FROM members WHERE memberID = :memberID;", {"memberID": member.id})
 
     # BLACKLISTED MEMEBERS #
 
-    def _create_blacklisted_member_table(self):
-        self.connection.execute(
-            "CREATE TABLE blacklistedMembers(memberID INT NOT NULL PRIMARY KEY, FOREIGN KEY (memberID) REFERENCES members(memberID));"
-        )
-
-    def get_blacklisted_members(self, member_id: int = "ANY") -> tuple[tuple[int]]:
-        return self.connection.execute(
-            "SELECT * FROM blacklistedMembers WHERE memberID = :memberID", {"memberID": member_id}
-        ).fetchall()
+    def get_blacklisted_members(self, member_id: int = None) -> tuple[tuple[int]]:
+        return self._query_table("blacklistedMembers", memberID=member_id)
 
     def add_blacklisted_member(self, member: discord.Member):
+        self._dirty = True
         self.connection.execute(
             "INSERT INTO blacklistedMembers (memberID) VALUES (:memberID);", {"memberID": member.id}
         )
 
     def remove_blacklisted_member(self, member: discord.Member):
+        self._dirty = True
         self.connection.execute("DELETE FROM blacklistedMembers WHERE memberID = :memberID;", {"memberID": member.id})
 
     # BLACKLISTED CHANNELS #
 
-    def _create_blacklisted_channels_table(self):
-        self.connection.execute("CREATE TABLE blacklistedChannels(channelID INT NOT NULL PRIMARY KEY);")
-
-    def get_blacklisted_channels(self, channel_id: int = "ANY") -> tuple[tuple[int]]:
-        return self.connection.execute(
-            "SELECT * FROM blacklistedChannels WHERE channelID = :channelID", {"channelID": channel_id}
-        ).fetchall()
+    def get_blacklisted_channels(self) -> frozenset[int]:
+        """Returns blacklisted channel IDs as a frozenset for O(1) membership tests"""
+        return frozenset(row[0] for row in self._reader.execute("SELECT channelID FROM blacklistedChannels"))
 
     def add_blacklisted_channel(self, channel: discord.ChannelType):
+        self._dirty = True
         self.connection.execute(
             "INSERT INTO blacklistedChannels (channelID) VALUES (:channelID);", {"channelID": channel.id}
         )
 
     def remove_blacklisted_channel(self, channel: discord.ChannelType):
+        self._dirty = True
         self.connection.execute(
             "DELETE FROM blacklistedChannels WHERE channelID = :channelID;", {"channelID": channel.id}
         )
 
     # ORIGINALS #
 
-    def _create_originals_table(self):
-        self.connection.execute(
-            """
-            CREATE TABLE originals(
-                url VARCHAR NOT NULL PRIMARY KEY,
-                messageID INT NOT NULL,
-                channelID INT NOT NULL,
-                memberID INT NOT NULL,
-                timestamp FLOAT NOT NULL,
-                FOREIGN KEY (memberID) REFERENCES members(id)
-            );
-            """
-        )
+    _original_index = None
+
+    @property
+    def original_index(self) -> dict:
+        """dict[str, dict] : In-memory copy of the originals table keyed by URL.
+
+        Writes go through add_original, which updates both the table and this index, so the
+        per-message repost check never touches SQLite at all.
+        """
+        if self._original_index is None:
+            self._original_index = {
+                row["url"]: {key: row[key] for key in row.keys()}
+                for row in self._reader.execute("SELECT * FROM originals")
+            }
+        return self._original_index
+
+    @property
+    def original_urls(self):
+        """Keys of original_index, kept for O(1) membership tests"""
+        return self.original_index.keys()
 
     def get_originals(
         self,
@@ -301,6 +408,7 @@ class GuildDatabase:
         return self._query_table("originals", **var_mapping)
 
     def add_original(self, url: str, message: discord.Message):
+        """Inserts the original post for a URL, replacing the previous holder on conflict"""
         var_mapping = {
             "url": url,
             "messageID": message.id,
@@ -308,25 +416,38 @@ class GuildDatabase:
             "memberID": message.author.id,
             "timestamp": message.created_at.timestamp(),
         }
-        self._add_to_table("originals", **var_mapping)
+        self.connection.execute(
+            """
+            INSERT INTO originals (url, messageID, channelID, memberID, timestamp)
+            VALUES (:url, :messageID, :channelID, :memberID, :timestamp)
+            ON CONFLICT (url) DO UPDATE SET
+                messageID = excluded.messageID,
+                channelID = excluded.channelID,
+                memberID = excluded.memberID,
+                timestamp = excluded.timestamp;
+            """,
+            var_mapping,
+        )
+        self._dirty = True
+        self.original_index[url] = var_mapping
+
+    def count_originals(self, member_id: int) -> int:
+        cursor = self._reader.cursor()
+        cursor.row_factory = None
+        return cursor.execute(
+            "SELECT COUNT(*) FROM originals WHERE memberID = :memberID;", {"memberID": member_id}
+        ).fetchone()[0]
 
     def update_original(self, url: str, message: discord.Message):
-        var_mapping = {
-            "url": url,
-            "messageID": message.id,
-            "channelID": message.channel.id,
-            "memberID": message.author.id,
-            "timestamp": message.created_at.timestamp(),
-        }
-        self._update_table("originals", **var_mapping)
+        self.add_original(url, message)
 
     def remove_originals(
         self,
-        url: str = "ANY",
-        message_id: int = "ANY",
-        channel_id: int = "ANY",
-        member_id: int = "ANY",
-        timestamp: float = "ANY",
+        url: str = None,
+        message_id: int = None,
+        channel_id: int = None,
+        member_id: int = None,
+        timestamp: float = None,
     ):
         var_mapping = {
             "url": url,
@@ -336,25 +457,11 @@ class GuildDatabase:
             "timestamp": timestamp,
         }
         self._remove_from_table("originals", **var_mapping)
+        # Removal conditions are arbitrary, so rebuild the index on next access
+        self._original_index = None
 
     # REPOSTS #
 
-    def _create_reposts_table(self):
-        self.connection.executescript(
-            """
-            CREATE TABLE reposts(
-                url VARCHAR NOT NULL,
-                messageID INT NOT NULL,
-                channelID INT NOT NULL,
-                memberID INT NOT NULL,
-                timestamp FLOAT NOT NULL,
-                FOREIGN KEY (url) REFERENCES urls(url),
-                FOREIGN KEY (memberID) REFERENCES members(id)
-            );
-            CREATE UNIQUE INDEX repost_index ON REPOSTS (url, messageID, channelID);
-            """
-        )
-
     def get_reposts(
         self,
         url: str = None,
@@ -372,23 +479,48 @@ class GuildDatabase:
         }
         return self._query_table("reposts", **var_mapping)
 
+    def iter_reposts(self, member_id: int):
+        """Streams a member's reposts newest-first without materializing them"""
+        return self._reader.execute(
+            "SELECT * FROM reposts WHERE memberID = :memberID ORDER BY timestamp DESC;",
+            {"memberID": member_id},
+        )
+
+    def count_reposts(self, member_id: int) -> int:
+        cursor = self._reader.cursor()
+        cursor.row_factory = None
+        return cursor.execute(
+            "SELECT COUNT(*) FROM reposts WHERE memberID = :memberID;", {"memberID": member_id}
+        ).fetchone()[0]
+
     def add_repost(self, url: str, message: discord.Message):
-        var_mapping = {
-            "url": url,
-            "messageID": message.id,
-            "channelID": message.channel.id,
-            "memberID": message.author.id,
-            "timestamp": message.created_at.timestamp(),
-        }
-        self._add_to_table("reposts", **var_mapping)
+        """Inserts a repost, ignoring duplicates so re-reviewing a message is idempotent"""
+        self.add_repost_row(url, message.id, message.channel.id, message.author.id, message.created_at.timestamp())
+
+    def add_repost_row(self, url: str, message_id: int, channel_id: int, member_id: int, timestamp: float):
+        """Inserts a repost from already-known column values, without needing a Message object"""
+        self.connection.execute(
+            """
+            INSERT OR IGNORE INTO reposts (url, messageID, channelID, memberID, timestamp)
+            VALUES (:url, :messageID, :channelID, :memberID, :timestamp);
+            """,
+            {
+                "url": url,
+                "messageID": message_id,
+                "channelID": channel_id,
+                "memberID": member_id,
+                "timestamp": timestamp,
+            },
+        )
+        self._dirty = True
 
     def remove_reposts(
         self,
-        url: str = "ANY",
-        message_id: int = "ANY",
-        channel_id: int = "ANY",
-        member_id: int = "ANY",
-        timestamp: float = "ANY",
+        url: str = None,
+        message_id: int = None,
+        channel_id: int = None,
+        member_id: int = None,
+        timestamp: float = None,
     ):
         var_mapping = {
             "url": url,
@@ -401,7 +533,47 @@ class GuildDatabase:
 
     def commit(self):
         self.connection.commit()
-
-    def __del__(self):
-        """Close connection on deletion"""
+        self._dirty = False
+
+    # Group commit: coalesce per-event commits so many writes share one fsync
+    _pending_commits = 0
+    _flush_handle = None
+
+    def schedule_commit(self):
+        """Commits after enough pending writes accumulate, or shortly after the first one"""
+        self._pending_commits += 1
+        if self._pending_commits >= 16:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(0.05, self._flush)
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        self._pending_commits = 0
+        self.commit()
+
+    def checkpoint(self):
+        """Moves WAL contents back into the main database without blocking writers"""
+        self.connection.execute("PRAGMA wal_checkpoint(PASSIVE);")
+
+    def close(self):
+        """Commits any pending writes and closes both connections"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        self.connection.commit()
+        # Fold the WAL back into the main file and truncate it, so the next startup
+        # opens a clean database instead of replaying a log that grew all session
+        self.connection.execute("PRAGMA wal_checkpoint(TRUNCATE);")
+        # Write back planner statistics so the next run starts with a warm query planner
+        self.connection.execute("PRAGMA optimize;")
         self.connection.close()
+        self.read_connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -8,16 +8,22 @@ Author: Scott Nealon
 import asyncio
 import datetime as dt
 import logging
+import time
+import urllib.parse
 from enum import Enum
 
 import discord
 import discord.ext.commands
+import discord.ext.tasks
 import humanize
 
 import guild_database
 
 logger = logging.getLogger(__name__)
 
+# Query parameters that identify a click rather than a destination, stripped before URLs are compared
+TRACKING_PARAMETERS = frozenset(("fbclid", "gclid", "igshid", "mc_eid", "si"))
+
 
 class URL_STATUS(Enum):
     NEW = 0
@@ -28,124 +34,191 @@ class URL_STATUS(Enum):
 
 class RepostBot(discord.ext.commands.Bot):
 
-    ready = False
-
     def __init__(self, **kwargs):
         self.guild_databases: dict[int, guild_database.GuildDatabase] = {}
+        # Set once on_ready finishes; handlers await it instead of polling
+        self.ready = asyncio.Event()
         intents = discord.Intents(messages=True, message_content=True, guilds=True, members=True)
         super().__init__(intents=intents, **kwargs)
 
+    async def close(self):
+        # Close guild databases explicitly rather than relying on garbage collection
+        for database in self.guild_databases.values():
+            database.close()
+        self.guild_databases.clear()
+        await super().close()
+
     async def update_database(self, guild: discord.Guild):
         """Updates database since last online"""
         self.update_members(guild)
         await self.review_messages(guild)
-        self.guild_databases[guild].commit()
+        # Commit off the event loop so the fsync doesn't stall other guilds
+        await asyncio.to_thread(self.guild_databases[guild.id].commit)
 
     def update_members(self, guild: discord.Guild):
         """Adds and removes members from database"""
-        # Add all guild members to database
-        for member in guild.members:
-            if not self.guild_databases[guild].is_member(member.id):
-                self.guild_databases[guild].add_member(member)
+        database = self.guild_databases[guild.id]
+        # One query for the known members, then set membership per guild member,
+        # instead of an EXISTS probe for every member every startup
+        known_member_ids = set(database.get_members())
+        # Add all missing guild members to database in one batch
+        database.add_members([member for member in guild.members if member.id not in known_member_ids])
 
     async def review_messages(self, guild: discord.Guild):
         """Reviews all messages in guild since last update"""
-        last_updated = self.guild_databases[guild].last_updated_datetime
-        logger.info(f"Reading messages in {guild} since {humanize.precisedelta(dt.datetime.now() - last_updated)} ago.")
-        blacklisted_channels = self.guild_databases[guild].get_blacklisted_channels()
-        # Iterate across all text channels in guild
-        for channel in guild.channels:
-            # Skip non-text channels
-            if not isinstance(channel, discord.TextChannel):
-                logger.info(f"{guild}/#{channel} is not a text channel.")
-                continue
+        last_updated = self.guild_databases[guild.id].last_updated_datetime
+        logger.info("Reading messages in %s since %s ago.", guild, humanize.precisedelta(dt.datetime.now() - last_updated))
+        blacklisted_channels = self.guild_databases[guild.id].get_blacklisted_channels()
+        # Crawl channels concurrently: startup cost drops from the sum of per-channel
+        # pagination latencies to roughly the slowest channel
+        channels = []
+        for channel in guild.text_channels:
             # Skip blacklisted channels
             if channel.id in blacklisted_channels:
-                logger.info(f"{guild}/#{channel} is blacklisted.")
+                logger.info("%s/#%s is blacklisted.", guild, channel)
                 continue
-            logger.info(f"Reading messages in {guild}/#{channel}")
-            # Iterate across all messages in channel since last updated
-            try:
-                async for message in channel.history(
-                    after=last_updated + dt.timedelta(microseconds=1), limit=None, oldest_first=True
-                ):
-                    await self.review_message(message)
-            # Catch error incase unable to access channel
-            except discord.Forbidden:
-                logger.warning(f"{guild}/#{channel} cannot be accessed.")
+            channels.append(channel)
+        # Bound the fan-out so a guild with many channels doesn't slam the HTTP
+        # rate limiter with every history request at once
+        semaphore = asyncio.Semaphore(8)
+
+        async def review_with_limit(channel: discord.TextChannel):
+            async with semaphore:
+                await self.review_channel(guild, channel, last_updated)
+
+        await asyncio.gather(*(review_with_limit(channel) for channel in channels))
+
+    async def review_channel(self, guild: discord.Guild, channel: discord.TextChannel, last_updated: dt.datetime):
+        """Reviews all messages in a single channel since last update"""
+        logger.info("Reading messages in %s/#%s", guild, channel)
+        # Iterate across all messages in channel since last updated
+        try:
+            async for message in channel.history(
+                after=last_updated + dt.timedelta(microseconds=1), limit=None, oldest_first=True
+            ):
+                await self.review_message(message)
+        # Catch error incase unable to access channel
+        except discord.Forbidden:
+            logger.warning("%s/#%s cannot be accessed.", guild, channel)
+        # Commit once per channel so a backfill lands as one transaction per channel rather
+        # than holding everything for the whole guild, bounding loss on interruption
+        await asyncio.to_thread(self.guild_databases[guild.id].commit)
 
     async def review_message(self, message: discord.Message) -> bool:
         """bool : Reviews individual message to check for repost, responds TRUE if database updated"""
         # Skip any message from self, bot, or starting with recognized command
-        if not (message.author == self or message.author.bot):
-            # Search through every embed for a URL
-            for embed in message.embeds:
-                if embed.url == discord.Embed.Empty:
-                    continue
-                # Check repost status
-                url_status = self.check_if_repost(embed.url, message)
-                # Deal with message according to status
-                if url_status == URL_STATUS.NEW:
-                    self.handle_new_url(embed.url, message)
-                elif url_status == URL_STATUS.REPOST:
-                    await self.mark_repost(embed.url, message)
-                elif url_status == URL_STATUS.REVERSE_REPOST:
-                    self.handle_reverse_repost(embed.url, message)
-                elif url_status == URL_STATUS.ALREADY_REPORTED:
-                    logger.debug(
-                        f"Already reported URL found: {message.guild}/#{message.channel} at {message.created_at} by {message.author}: {embed.url}"
-                    )
-                else:
-                    raise ValueError("Invalid URL status returned.")
-
-    def check_if_repost(self, url: str, message: discord.Message) -> int:
+        if message.author == self or message.author.bot:
+            return
+        # Most messages carry no embeds at all, so bail out before any database access
+        if not message.embeds:
+            return
+        database = self.guild_databases[message.guild.id]
+        # Collect the unique URLs across all embeds; originals are served from the in-memory index
+        urls = list(dict.fromkeys(self.normalize_url(embed.url) for embed in message.embeds if embed.url))
+        originals = database.original_index
+        # datetime.timestamp() resolves timezones; compute it once per message, not per URL
+        message_timestamp = message.created_at.timestamp()
+        for url in urls:
+            # Check repost status
+            url_status = self.check_if_repost(url, message, originals.get(url), message_timestamp)
+            # Deal with message according to status
+            if url_status == URL_STATUS.NEW:
+                self.handle_new_url(url, message)
+            elif url_status == URL_STATUS.REPOST:
+                await self.mark_repost(url, message)
+            elif url_status == URL_STATUS.REVERSE_REPOST:
+                await self.handle_reverse_repost(url, message)
+            elif url_status == URL_STATUS.ALREADY_REPORTED:
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Already reported URL found: %s", self.message_content_log_str(message, url))
+            else:
+                raise ValueError("Invalid URL status returned.")
+
+    def check_if_repost(self, url: str, message: discord.Message, original=None, message_timestamp: float = None) -> int:
         """Returns whether URL is a repost or not"""
-        # Check if URL has been posted before
-        try:
-            original = self.guild_databases[message.guild].get_originals(url=url)[0]
-        except IndexError:
+        if message_timestamp is None:
+            message_timestamp = message.created_at.timestamp()
+        database = self.guild_databases[message.guild.id]
+        # Most URLs are new, so check the preloaded URL set before touching the database
+        if url not in database.original_urls:
             return URL_STATUS.NEW
+        # Check if URL has been posted before, unless the caller already fetched the original
+        if original is None:
+            try:
+                original = database.get_originals(url=url)[0]
+            except IndexError:
+                return URL_STATUS.NEW
+        if original["messageID"] == message.id and original["channelID"] == message.channel.id:
+            return URL_STATUS.ALREADY_REPORTED
+        elif original["timestamp"] < message_timestamp:
+            return URL_STATUS.REPOST
         else:
-            if original["messageID"] == message.id and original["channelID"] == message.channel.id:
-                return URL_STATUS.ALREADY_REPORTED
-            elif original["timestamp"] < message.created_at.timestamp():
-                return URL_STATUS.REPOST
-            else:
-                return URL_STATUS.REVERSE_REPOST
+            return URL_STATUS.REVERSE_REPOST
+
+    @staticmethod
+    def normalize_url(url: str) -> str:
+        """Canonicalizes a URL so tracker-decorated copies of the same link match as reposts"""
+        parts = urllib.parse.urlsplit(url)
+        query = "&".join(
+            pair
+            for pair in parts.query.split("&")
+            if pair
+            and not pair.partition("=")[0].lower().startswith("utm_")
+            and pair.partition("=")[0].lower() not in TRACKING_PARAMETERS
+        )
+        # Fragments never change the linked resource, so drop them outright
+        return urllib.parse.urlunsplit((parts.scheme, parts.netloc, parts.path, query, ""))
 
     @staticmethod
     def message_content_log_str(message: discord.Message, url: str) -> str:
         return f"{message.guild}/#{message.channel} at {message.created_at} by {message.author}: {url}"
 
     def handle_new_url(self, url: str, message: discord.Message):
-        logger.debug(f"New URL found: {self.message_content_log_str(message, url)}")
-        self.guild_databases[message.guild].add_original(url, message)
+        # Build the log string only when debug logging is on; this runs per URL on the hot path
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("New URL found: %s", self.message_content_log_str(message, url))
+        self.guild_databases[message.guild.id].add_original(url, message)
 
     async def mark_repost(self, url: str, message: discord.Message):
-        logger.debug(f"Reposted URL found: {self.message_content_log_str(message, url)}")
-        await message.add_reaction(self.guild_databases[message.guild].emoji)
-        self.guild_databases[message.guild].add_repost(url, message)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Reposted URL found: %s", self.message_content_log_str(message, url))
+        database = self.guild_databases[message.guild.id]
+        await message.add_reaction(database.emoji)
+        database.add_repost(url, message)
 
     async def handle_reverse_repost(self, url: str, message: discord.Message):
-        logger.debug(f"Reverse repost URL found: {self.message_content_log_str(message, url)}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Reverse repost URL found: %s", self.message_content_log_str(message, url))
+        database = self.guild_databases[message.guild.id]
+        # Capture the displaced original before it is overwritten
+        original = database.original_index[url]
         # Update database with new message
-        self.guild_databases[message.guild].update_original(url, message)
-        # Retrieve old message
-        original = self.guild_databases[message.guild].get_originals(url=url)[0]
-        old_message: discord.Message = await message.guild.get_channel(original["channelID"]).fetch_message(original["messageID"])
-        # Mark as repost
-        await old_message.add_reaction(self.guild_databases[message.guild].emoji)
-        self.guild_databases[message.guild].add_repost(url, old_message)
+        database.update_original(url, message)
+        # The displaced message becomes a repost; a partial message is enough to
+        # react to it without a fetch_message round trip to Discord
+        old_channel = message.guild.get_channel(original["channelID"])
+        if old_channel is not None:
+            await old_channel.get_partial_message(original["messageID"]).add_reaction(database.emoji)
+        database.add_repost_row(url, original["messageID"], original["channelID"], original["memberID"], original["timestamp"])
 
     @staticmethod
     def original_message_link(guild_id: int, channel_id: int, message_id: int) -> str:
         return f"https://discord.com/channels/{guild_id}/{channel_id}/{message_id}"
 
     def url_repost_readable(
-        self, guild: discord.Guild, url: str, message_id: int, channel_id: int, member_id: int, timestamp: float
+        self,
+        guild: discord.Guild,
+        url: str,
+        message_id: int,
+        channel_id: int,
+        member_id: int,
+        timestamp: float,
+        now_ts: float = None,
     ):
         """Returns human readable context for message"""
-        humanized_delta_time = humanize.naturaltime(dt.datetime.now() - dt.datetime.fromtimestamp(timestamp))
+        if now_ts is None:
+            now_ts = time.time()
+        humanized_delta_time = humanize.naturaltime(dt.timedelta(seconds=now_ts - timestamp))
         author: discord.Member = guild.get_member(member_id)
         author_name = author.name if author else "Unknown Member"
         channel: discord.ChannelType = guild.get_channel(channel_id)
@@ -153,31 +226,44 @@ class RepostBot(discord.ext.commands.Bot):
         orignal_message_link = self.original_message_link(guild.id, channel_id, message_id)
         return f"• {humanized_delta_time} by {author_name} in [{channel_name}]({orignal_message_link})"
 
-    def user_repost_readable(self, guild: discord.Guild, url: str, message_id: int, channel_id: int, member_id: int, timestamp: float):
-        humanized_delta_time = humanize.naturaltime(dt.datetime.now() - dt.datetime.fromtimestamp(timestamp))
+    def user_repost_readable(
+        self,
+        guild: discord.Guild,
+        url: str,
+        message_id: int,
+        channel_id: int,
+        member_id: int,
+        timestamp: float,
+        now_ts: float = None,
+    ):
+        if now_ts is None:
+            now_ts = time.time()
+        humanized_delta_time = humanize.naturaltime(dt.timedelta(seconds=now_ts - timestamp))
         channel: discord.ChannelType = guild.get_channel(channel_id)
         channel_name = f"#{channel.name}" if channel else "Unknown Channel"
         orignal_message_link = self.original_message_link(guild.id, channel_id, message_id)
         return f"• {humanized_delta_time} in [{channel_name}]({orignal_message_link}): {url}"
 
     def create_url_query_embed(self, guild: discord.Guild, url: str) -> discord.Embed:
+        # Capture the clock once so every rendered line shares the same reference time
+        now_ts = time.time()
         # Record properties of original message
         description = "**Original Post**\n"
         try:
-            original = self.guild_databases[guild].get_originals(url=url)[0]
+            original = self.guild_databases[guild.id].get_originals(url=url)[0]
         except IndexError:
             raise ValueError("URL not found in database.")
-        description += self.url_repost_readable(guild, *original)
+        description += self.url_repost_readable(guild, *original, now_ts=now_ts)
         # Record properties of repost
         description += "\n\n**Reposts**\n"
-        reposts = self.guild_databases[guild].get_reposts(url=url)
+        reposts = self.guild_databases[guild.id].get_reposts(url=url)
         repost_lines = []
         if len(reposts) == 0:
             repost_lines.append("No one has reposted this link. Congradulation!")
         else:
             repost_lines.append(f"This URL has been reposted {len(reposts)} times:")
             for repost in reposts:
-                repost_lines.append({self.url_repost_readable(guild, *repost)})
+                repost_lines.append(self.url_repost_readable(guild, *repost, now_ts=now_ts))
         # Limit total length
         repost_lenght = len(description) + sum([len(line) + 2 for line in repost_lines]) - 2
         shortening = repost_lenght > 4096
@@ -196,8 +282,11 @@ class RepostBot(discord.ext.commands.Bot):
         return embed
 
 
+# TODO: Remove localized guild ids
+DEBUG_GUILD_IDS = [309873284697292802, 797250748869115904]
+
 # Create RepostBot and add events
-repost_bot = RepostBot(debug_guilds=[309873284697292802, 797250748869115904])
+repost_bot = RepostBot(debug_guilds=DEBUG_GUILD_IDS)
 
 
 @repost_bot.event
@@ -205,29 +294,40 @@ async def on_ready():
 
     # For each guild, open or create a database and update it since last viewing.
     for guild in repost_bot.guilds:
-        repost_bot.guild_databases[guild] = guild_database.GuildDatabase(guild, repost_bot)
+        repost_bot.guild_databases[guild.id] = guild_database.GuildDatabase(guild, repost_bot)
         await repost_bot.update_database(guild)
 
-    repost_bot.ready = True
+    if not checkpoint_wal.is_running():
+        checkpoint_wal.start()
+
+    repost_bot.ready.set()
     logger.info("on_ready() complete.")
 
 
+@discord.ext.tasks.loop(seconds=30)
+async def checkpoint_wal():
+    """Checkpoints each guild's WAL in the background so commits never pay checkpoint cost inline"""
+    for database in list(repost_bot.guild_databases.values()):
+        await asyncio.to_thread(database.checkpoint)
+
+
 @repost_bot.event
 async def on_message(message: discord.Message):
     # Don't do anything until ready
-    while not repost_bot.ready:
-        await asyncio.sleep(1)
+    await repost_bot.ready.wait()
     # Do nothing if inactive in server, or on a bot
     # TODO: Handle non-guild text channels
-    if message.author.bot or not repost_bot.guild_databases[message.guild].active:
+    database = repost_bot.guild_databases[message.guild.id]
+    if message.author.bot or not database.active:
         return
     # Read message
     await repost_bot.review_message(message)
     # Update last updated
     message_timestamp = message.created_at.timestamp()
-    if message_timestamp > repost_bot.guild_databases[message.guild].last_updated:
-        repost_bot.guild_databases[message.guild].last_updated = message_timestamp
-    repost_bot.guild_databases[message.guild].commit()
+    if message_timestamp > database.last_updated:
+        database.last_updated = message_timestamp
+    # Group commit: many messages share one fsync instead of paying one each
+    database.schedule_commit()
 
 
 @repost_bot.event
@@ -237,26 +337,24 @@ async def on_message_edit(old_message: discord.Message, new_message: discord.Mes
 
 @repost_bot.event
 async def on_member_join(member: discord.Member):
-    while not repost_bot.ready:
-        await asyncio.sleep(1)
-    repost_bot.guild_databases[member.guild].add_member(member)
+    await repost_bot.ready.wait()
+    repost_bot.guild_databases[member.guild.id].add_member(member)
 
 
-# TODO: Remove localized guild id
-@repost_bot.slash_command(guild_ids=[309873284697292802, 797250748869115904])
+@repost_bot.slash_command(guild_ids=DEBUG_GUILD_IDS)
 async def ping(context: discord.ext.commands.Context):
     await context.respond("Pong.")
 
 
 @repost_bot.slash_command(
-    description="Posts a link to the bot's GitHub repository.", guild_ids=[309873284697292802, 797250748869115904]
+    description="Posts a link to the bot's GitHub repository.", guild_ids=DEBUG_GUILD_IDS
 )
 async def repo(context: discord.ext.commands.Context):
     await context.respond("https://github.com/ScottNealon/DiscordRepostBot")
 
 
 @repost_bot.slash_command(
-    description="Posts a link to the bot's privacy policy.", guild_ids=[309873284697292802, 797250748869115904]
+    description="Posts a link to the bot's privacy policy.", guild_ids=DEBUG_GUILD_IDS
 )
 async def privacy(context: discord.ext.commands.Context):
     await context.respond("https://github.com/ScottNealon/DiscordRepostBot/blob/main/PRIVACY.md")
@@ -267,14 +365,14 @@ repost_commands = discord.SlashCommandGroup("repost", "Repost related commands")
 
 @repost_commands.command(
     description="Provides link to original message in server to post URL.",
-    guild_ids=[309873284697292802, 797250748869115904],
+    guild_ids=DEBUG_GUILD_IDS,
 )
 async def original(
     context: discord.ext.commands.Context,
     url: discord.Option(str),
 ):
     try:
-        embed = repost_bot.create_url_query_embed(context.guild, url)
+        embed = repost_bot.create_url_query_embed(context.guild, repost_bot.normalize_url(url))
         await context.respond(embed=embed)
     except ValueError:
         await context.respond(f"ERROR: Unable to find previous post of {url}", ephemeral=True)
@@ -283,14 +381,14 @@ async def original(
 repost_bot.add_application_command(repost_commands)
 
 
-@repost_bot.message_command(name="Analyze Message", guild_ids=[309873284697292802, 797250748869115904])
+@repost_bot.message_command(name="Analyze Message", guild_ids=DEBUG_GUILD_IDS)
 async def orginal_post(context: discord.ext.commands.Context, message: discord.Message):
     responded = False
     for embed in message.embeds:
-        if embed.url == discord.Embed.Empty:
+        if not embed.url:
             continue
         try:
-            embed = repost_bot.create_url_query_embed(context.guild, embed.url)
+            embed = repost_bot.create_url_query_embed(context.guild, repost_bot.normalize_url(embed.url))
             await context.respond(embed=embed)
             responded = True
         except ValueError:
@@ -298,39 +396,65 @@ async def orginal_post(context: discord.ext.commands.Context, message: discord.M
     if not responded:
         await context.respond(f"No URLs founds on message.", ephemeral=True)
 
-@repost_bot.user_command(name="User Statistics", guild_ids=[309873284697292802, 797250748869115904])
+@repost_bot.user_command(name="User Statistics", guild_ids=DEBUG_GUILD_IDS)
 async def user_statistics(context: discord.ext.commands.Context, member: discord.Member):
-    # Get all urls and reposts from user
-    originals = repost_bot.guild_databases[context.guild].get_originals(member_id=member.id)
-    reposts = repost_bot.guild_databases[context.guild].get_reposts(member_id=member.id)
+    # Count urls and reposts in the database rather than fetching every row
+    database = repost_bot.guild_databases[context.guild.id]
+    num_originals = database.count_originals(member.id)
+    num_reposts = database.count_reposts(member.id)
     # Create embed
     embed = discord.Embed(title=member.display_name, color=discord.Colour.blurple())
     if member.display_avatar:
         embed.set_thumbnail(url=member.display_avatar)
     # Add fields
-    embed.add_field(name="Original URLs", value=len(originals))
-    embed.add_field(name="Reposts", value=len(reposts))
-    embed.add_field(name="Repost Rate", value=f"{100 * len(reposts) / (len(originals) + len(reposts)):.1f}%")
+    embed.add_field(name="Original URLs", value=num_originals)
+    embed.add_field(name="Reposts", value=num_reposts)
+    # Members with no posted URLs at all have a zero rate, not a division error
+    num_urls = num_originals + num_reposts
+    repost_rate = 100 * num_reposts / num_urls if num_urls else 0
+    embed.add_field(name="Repost Rate", value=f"{repost_rate:.1f}%")
     await context.respond(embed=embed)
 
-@repost_bot.user_command(name="User Reposts", guild_ids=[309873284697292802, 797250748869115904])
+@repost_bot.user_command(name="User Reposts", guild_ids=DEBUG_GUILD_IDS)
 async def user_reposts(context: discord.ext.commands.Context, member: discord.Member):
+    # Stream reposts newest-first and stop once the embed budget is full, so
+    # memory stays bounded no matter how long the member's history is
+    database = repost_bot.guild_databases[context.guild.id]
+    total_reposts = database.count_reposts(member.id)
+    # Discord rejects a respond with no embeds, so answer in plain text
+    if total_reposts == 0:
+        await context.respond(f"{member.display_name} has no reposts.", ephemeral=True)
+        return
+    repost_cursor = database.iter_reposts(member.id)
+    # Format rows lazily, sharing one clock read across the batch
+    now_ts = time.time()
     embeds = []
-    reposts = repost_bot.guild_databases[context.guild].get_reposts(member_id=member.id)
-    # Convert reposts into readable lines
-    reposts_readable = [repost_bot.user_repost_readable(context.guild, *repost) for repost in reposts]
+    shown_reposts = 0
+    pending_line = None
+    exhausted = False
     # Seperate reposts into seperate embeds
-    while reposts_readable and len(embeds) < 10:
+    while not exhausted and len(embeds) < 10:
         embed_reposts_readable = ["**Reposts**"]
         embed_reposts_len = 0
-        while reposts_readable and embed_reposts_len + len(reposts_readable[-1]) < 4000 + 2:
-            embed_reposts_readable.append(reposts_readable.pop())
-            embed_reposts_len += len(embed_reposts_readable[-1]) + 2
+        while True:
+            if pending_line is None:
+                repost = repost_cursor.fetchone()
+                if repost is None:
+                    exhausted = True
+                    break
+                pending_line = repost_bot.user_repost_readable(context.guild, *repost, now_ts=now_ts)
+            if embed_reposts_len + len(pending_line) >= 4000 + 2:
+                break
+            embed_reposts_readable.append(pending_line)
+            embed_reposts_len += len(pending_line) + 2
+            shown_reposts += 1
+            pending_line = None
+        # Skip an empty trailing embed
+        if len(embed_reposts_readable) == 1:
+            break
         # Deal with overflow
-        if reposts_readable and len(embeds) == 10:
-            reposts_readable = reposts_readable[:-2]
-            remaining_reposts = len(reposts_readable) + 2
-            reposts_readable.append(f"(Plus {remaining_reposts} additional older reposts)")
+        if not exhausted and len(embeds) == 9 and shown_reposts < total_reposts:
+            embed_reposts_readable.append(f"(Plus {total_reposts - shown_reposts} additional older reposts)")
         # Create embed
         description = "\n".join(embed_reposts_readable)
         embed = discord.Embed(title=member.display_name, description=description, color=discord.Colour.blurple())